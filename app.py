@@ -1,12 +1,19 @@
+import hashlib
 import io
+import json
+import mimetypes
 import os
 import re # Importado para a função de auto-incremento
+import time
 import zipfile
-from typing import List, Tuple, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional, Set
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from urllib3.util.retry import Retry
 import streamlit as st
 from PIL import Image
-from datetime import datetime
 
 # =====================================
 # Configuração de Página e Tema
@@ -68,20 +75,30 @@ else:
 # =====================================
 # Funções Utilitárias (Seu código original, sem alterações)
 # =====================================
+# Formatos de imagem já comprimidos: DEFLATE não reduz o tamanho, só gasta CPU
+EXTENSOES_COMPRIMIDAS = {".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif"}
+# Limite de upload de arquivos da Bot API do Telegram
+TELEGRAM_MAX_BYTES = 50 * 1024 * 1024
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
 def sizeof_fmt(num: Optional[int]) -> str:
     if not num: return "0 B"
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if num < 1024.0: return f"{num:3.1f} {unit}"
-        num /= 1024.0
-    return f"{num:.1f} PB"
+    # Cada unidade equivale a 10 bits a mais, então o índice sai direto de bit_length();
+    # valores abaixo de 1 (bit_length 0) ficam em bytes
+    i = min(max(0, (int(num).bit_length() - 1) // 10), len(_SIZE_UNITS) - 1)
+    return f"{num / (1 << (10 * i)):3.1f} {_SIZE_UNITS[i]}"
 
 def split_name_ext(name: str) -> Tuple[str, str]:
     base = os.path.basename(name)
     root, ext = os.path.splitext(base)
     return (root, ext.lower())
 
+# \w casa exatamente str.isalnum() + "_", então o resultado é o mesmo do loop por caractere
+_SLUG_RE = re.compile(r"[^\w-]")
+
 def slugify(s: str) -> str:
-    return "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in s)
+    return _SLUG_RE.sub("_", s)
 
 def unique_photo_name(original_name: str, serial: str, counter: int) -> str:
     root, ext = split_name_ext(original_name or "camera-input.png")
@@ -90,17 +107,20 @@ def unique_photo_name(original_name: str, serial: str, counter: int) -> str:
     serial_tag = f"NS-{slugify(serial)}_" if serial else ""
     return f"{serial_tag}{root}_{counter:03d}{ext}"
 
-def ensure_unique(name: str, used: Set[str]) -> str:
+def ensure_unique(name: str, used: Dict[str, int]) -> str:
+    # used guarda, para cada nome já usado, o último sufixo (n) gerado a partir dele,
+    # então uma nova colisão continua de onde parou em vez de testar (2), (3), ... de novo
     if name not in used:
-        used.add(name)
+        used[name] = 1
         return name
     root, ext = split_name_ext(name)
-    i = 2
+    i = used[name] + 1
     new_name = f"{root}({i}){ext}"
     while new_name in used:
         i += 1
         new_name = f"{root}({i}){ext}"
-    used.add(new_name)
+    used[name] = i
+    used[new_name] = 1
     return new_name
 
 def apply_serial_to_zipname(base_zip: str, serial: str, part: Optional[int] = None) -> str:
@@ -111,71 +131,149 @@ def apply_serial_to_zipname(base_zip: str, serial: str, part: Optional[int] = No
     root = slugify(root) or "fotos"
     return f"{root}{tag}{suffix}{ext}"
 
-def try_convert_heic_to_jpg(buffer: bytes) -> Tuple[bytes, bool]:
+def try_convert_to_jpg(buffer: bytes) -> Tuple[bytes, bool]:
     try:
-        import pillow_heif
-        pillow_heif.register_heif_opener()
         img = Image.open(io.BytesIO(buffer)).convert("RGB")
         out = io.BytesIO()
-        img.save(out, format="JPEG", quality=90)
+        # Caminho baseline rápido do libjpeg: 4:2:0 explícito, sem passada extra de
+        # otimização Huffman nem modo progressivo. EXIF não é copiado (não passamos exif=).
+        img.save(out, format="JPEG", quality=90, subsampling=2, optimize=False, progressive=False)
         out.seek(0)
         return out.getvalue(), True
     except Exception:
         return buffer, False
 
+def camera_photo_as_jpeg(photo):
+    # Capturas em PNG ficam 5-10x maiores que o JPEG equivalente: converte uma vez, na captura
+    if getattr(photo, "type", "") != "image/png":
+        return photo
+    data, converted = try_convert_to_jpg(photo.getvalue())
+    if not converted:
+        return photo
+    jpeg = io.BytesIO(data)
+    jpeg.name = split_name_ext(getattr(photo, "name", "camera-input.png"))[0] + ".jpg"
+    return jpeg
+
+def prepare_photos(file_objs, serial: str = "", convert_heic: bool = False) -> List[Tuple[str, Optional[bytes]]]:
+    """Nome final de cada foto e, para HEIC convertido, os bytes do JPEG (None = usar o upload como está)."""
+    used_names: Dict[str, int] = {}
+    names = [
+        ensure_unique(unique_photo_name(getattr(f, "name", "camera-input.png"), serial, idx), used_names)
+        for idx, f in enumerate(file_objs, start=1)
+    ]
+
+    # Conversão HEIC -> JPEG em paralelo: a decodificação (libheif) e a codificação
+    # (libjpeg) liberam o GIL; quem monta o ZIP ou o álbum recebe tudo já pronto
+    heic_indices = [
+        i for i, name in enumerate(names)
+        if convert_heic and split_name_ext(name)[1] in (".heic", ".heif")
+    ]
+    conversions: Dict[int, Tuple[bytes, bool]] = {}
+    if heic_indices:
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+            results = pool.map(try_convert_to_jpg, [file_objs[i].getvalue() for i in heic_indices])
+            conversions = dict(zip(heic_indices, results))
+
+    photos: List[Tuple[str, Optional[bytes]]] = []
+    for i, name in enumerate(names):
+        data, converted = conversions.get(i, (None, False))
+        if converted:
+            _, ext = split_name_ext(name)
+            photos.append((name.rsplit(ext, 1)[0] + ".jpg", data))
+        else:
+            photos.append((name, None))
+    return photos
+
 def make_zip_in_memory(
     file_objs,
     filename: str,
     serial: str = "",
     convert_heic: bool = False,
-    compresslevel: int = 9
-) -> bytes:
-    mem = io.BytesIO()
-    used_names: Set[str] = set()
-    listed_names: List[str] = []
+    compresslevel: int = 1
+) -> io.BytesIO:
+    # As fotos entram sem compressão, então o ZIP fica perto da soma dos arquivos:
+    # o buffer é reservado de uma vez em vez de crescer por realocações sucessivas
+    reserva = sum(file_size(f) for f in file_objs) + 512 * len(file_objs) + 64 * 1024
+    mem = io.BytesIO(bytes(reserva))
+    agora = time.localtime()
 
     with zipfile.ZipFile(mem, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
-        for idx, f in enumerate(file_objs, start=1):
-            orig = getattr(f, "name", "camera-input.png")
-            name = unique_photo_name(orig, serial, idx)
-            name = ensure_unique(name, used_names)
-
-            data = f.read()
-            f.seek(0)
-
+        for f, (name, data) in zip(file_objs, prepare_photos(file_objs, serial, convert_heic)):
             _, ext = split_name_ext(name)
-            if convert_heic and ext in (".heic", ".heif"):
-                data, converted = try_convert_heic_to_jpg(data)
-                if converted:
-                    name = name.rsplit(ext, 1)[0] + ".jpg"
-
-            zf.writestr(name, data)
-            listed_names.append(name)
-
-        manifest = [
-            f"SERIAL: {serial}",
-            f"ARQUIVO_ZIP: {filename}",
-            f"CRIADO_EM: {datetime.now():%Y-%m-%d %H:%M:%S}",
-            f"QTD_ARQUIVOS: {len(listed_names)}",
-            "ARQUIVOS:",
-            *[f"  - {n}" for n in listed_names],
-        ]
-        zf.writestr("MANIFESTO.txt", "\n".join(manifest))
-
+            info = zipfile.ZipInfo(name, date_time=agora[:6])
+            info.external_attr = 0o600 << 16
+            # Fotos entram sem compressão (ZIP_STORED); o resto usa DEFLATE
+            info.compress_type = zipfile.ZIP_STORED if ext in EXTENSOES_COMPRIMIDAS else zipfile.ZIP_DEFLATED
+
+            if data is not None:
+                zf.writestr(info, data)
+            else:
+                # UploadedFile é um BytesIO: getbuffer() entrega os bytes ao ZIP sem nenhuma cópia
+                # Cabeçalhos ZIP64 só quando o arquivo realmente passa do limite do ZIP32
+                zip64 = file_size(f) >= zipfile.ZIP64_LIMIT
+                with zf.open(info, mode="w", force_zip64=zip64) as dst, f.getbuffer() as view:
+                    dst.write(view)
+
+        # Tamanho e CRC32 de cada foto já foram calculados pelo zipfile durante a escrita
+        entries = list(zf.infolist())
+
+        # O manifesto é escrito direto na entrada do ZIP, sem montar uma lista de linhas.
+        # Recebe a mesma data e permissões das fotos; o nível do slider vai no próprio
+        # ZipInfo (zf.open não usa o compresslevel do ZipFile) e newline fixa o "\n"
+        info = zipfile.ZipInfo("MANIFESTO.txt", date_time=agora[:6])
+        info.external_attr = 0o600 << 16
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info._compresslevel = compresslevel
+        with io.TextIOWrapper(zf.open(info, mode="w"), encoding="utf-8", newline="\n") as manifest:
+            manifest.write(
+                f"SERIAL: {serial}\n"
+                f"ARQUIVO_ZIP: {filename}\n"
+                f"CRIADO_EM: {time.strftime('%Y-%m-%d %H:%M:%S', agora)}\n"
+                f"QTD_ARQUIVOS: {len(entries)}\n"
+                "ARQUIVOS:"
+            )
+            manifest.writelines(
+                f"\n  - {e.filename} ({e.file_size} bytes, CRC32 {e.CRC:08x})" for e in entries
+            )
+
+    # Descarta a sobra da reserva e devolve o próprio buffer, sem copiar para bytes
+    mem.truncate(mem.tell())
     mem.seek(0)
-    return mem.getvalue()
-
-def send_zip_to_telegram(zip_bytes: bytes, filename: str, bot_token: str, chat_id: str, caption: str = ""):
-    if not bot_token or not chat_id:
-        raise ValueError("BOT_TOKEN ou CHAT_ID ausentes.")
-    if len(zip_bytes) > 50 * 1024 * 1024:
-        raise ValueError("ZIP acima de 50 MB (limite da Bot API do Telegram).")
-    
-    url = f"https://api.telegram.org/bot{bot_token}/sendDocument"
-    files_payload = {"document": (filename, io.BytesIO(zip_bytes), "application/zip")}
-    data = {"chat_id": chat_id, "caption": caption}
+    return mem
+
+@st.cache_resource
+def get_telegram_session() -> requests.Session:
+    """Sessão HTTP única por processo: reaproveita a conexão TLS com a API do Telegram entre envios e reruns."""
+    # Repete apenas falhas de conexão, que acontecem antes de o corpo ser enviado;
+    # erros de leitura não são repetidos para não duplicar envios. O 429 é tratado em
+    # post_to_telegram, pois o corpo em streaming precisa ser remontado a cada tentativa.
+    retries = Retry(
+        total=3, connect=3, read=0, status=0,
+        allowed_methods=frozenset({"POST"}),
+        backoff_factor=0.5,
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retries))
+    return session
+
+def post_to_telegram(bot_token: str, method: str, make_fields) -> dict:
+    """POST multipart na Bot API, reenviando em caso de 429 (flood control).
+
+    make_fields monta os campos a cada tentativa: o corpo é lido em streaming e
+    consumido no envio, então os arquivos precisam ser rebobinados antes de reenviar.
+    """
+    url = f"https://api.telegram.org/bot{bot_token}/{method}"
+    session = get_telegram_session()
     
-    resp = requests.post(url, data=data, files=files_payload, timeout=90)
+    for tentativa in range(1, 4):
+        # O corpo multipart é lido direto dos buffers, em blocos, sem montar uma cópia em memória
+        body = MultipartEncoder(fields=make_fields())
+        resp = session.post(url, data=body, headers={"Content-Type": body.content_type}, timeout=90)
+        if resp.status_code != 429 or tentativa == 3:
+            break
+        # 429 = flood control: espera o tempo pedido pelo Telegram e reenvia
+        retry_after = resp.json().get("parameters", {}).get("retry_after", 1)
+        time.sleep(min(retry_after, 30))
     resp.raise_for_status() # Lança exceção para erros HTTP (4xx ou 5xx)
     
     j = resp.json()
@@ -183,14 +281,69 @@ def send_zip_to_telegram(zip_bytes: bytes, filename: str, bot_token: str, chat_i
         raise RuntimeError(f"O Telegram retornou um erro: {j.get('description', 'sem detalhes')}")
     return j
 
-def chunk_files_by_size(files, max_bytes=45 * 1024 * 1024):
+def send_zip_to_telegram(zip_stream: io.BytesIO, filename: str, bot_token: str, chat_id: str, caption: str = ""):
+    if not bot_token or not chat_id:
+        raise ValueError("BOT_TOKEN ou CHAT_ID ausentes.")
+    if zip_stream.getbuffer().nbytes > TELEGRAM_MAX_BYTES:
+        raise ValueError("ZIP acima de 50 MB (limite da Bot API do Telegram).")
+    
+    def fields():
+        zip_stream.seek(0)
+        return {
+            "chat_id": str(chat_id),
+            "caption": caption,
+            "document": (filename, zip_stream, "application/zip"),
+        }
+    return post_to_telegram(bot_token, "sendDocument", fields)
+
+def send_album_to_telegram(photos: List[Tuple[str, io.BytesIO]], bot_token: str, chat_id: str, caption: str = ""):
+    """Envia até 10 fotos como documentos num único álbum (sendMediaGroup), sem ZIP."""
+    if not bot_token or not chat_id:
+        raise ValueError("BOT_TOKEN ou CHAT_ID ausentes.")
+    if not 1 <= len(photos) <= 10:
+        raise ValueError("Um álbum do Telegram aceita de 1 a 10 arquivos.")
+    
+    def part(name: str, stream: io.BytesIO):
+        stream.seek(0)
+        return (name, stream, mimetypes.guess_type(name)[0] or "application/octet-stream")
+    
+    # sendMediaGroup exige pelo menos 2 itens; uma foto sozinha vai como documento comum
+    if len(photos) == 1:
+        name, stream = photos[0]
+        return post_to_telegram(bot_token, "sendDocument", lambda: {
+            "chat_id": str(chat_id),
+            "caption": caption,
+            "document": part(name, stream),
+        })
+    
+    media = [{"type": "document", "media": f"attach://file{i}"} for i in range(len(photos))]
+    if caption:
+        media[0]["caption"] = caption  # Legenda no primeiro item aparece como legenda do álbum
+    
+    def fields():
+        out = {"chat_id": str(chat_id), "media": json.dumps(media)}
+        for i, (name, stream) in enumerate(photos):
+            out[f"file{i}"] = part(name, stream)
+        return out
+    return post_to_telegram(bot_token, "sendMediaGroup", fields)
+
+def file_size(f) -> int:
+    # UploadedFile já informa o tamanho; senão lê do buffer, sem mover o cursor do arquivo
+    size = getattr(f, "size", None)
+    if size is None:
+        size = f.getbuffer().nbytes
+    return size
+
+def file_digest(f) -> bytes:
+    # BLAKE2b sobre o buffer do upload (sem cópia), usado para descartar fotos repetidas
+    return hashlib.blake2b(f.getbuffer(), digest_size=16).digest()
+
+def chunk_files_by_size(files, max_bytes=45 * 1024 * 1024, size_of=file_size):
     batches: List[List] = []
     current: List = []
     total = 0
     for f in files:
-        f.seek(0, os.SEEK_END)
-        size = f.tell()
-        f.seek(0)
+        size = size_of(f)
         
         if size > max_bytes:
             if current:
@@ -214,9 +367,11 @@ def chunk_files_by_size(files, max_bytes=45 * 1024 * 1024):
 # =====================================
 # Lógica Adicional
 # =====================================
+_TRAILING_NUM_RE = re.compile(r'(\d+)$')
+
 def increment_serial(serial_str: str) -> str:
     """Encontra o último número no NS e o incrementa, preservando o preenchimento com zeros."""
-    match = re.search(r'(\d+)$', serial_str)
+    match = _TRAILING_NUM_RE.search(serial_str)
     if not match:
         return serial_str # Retorna original se não houver número no final
     
@@ -227,12 +382,18 @@ def increment_serial(serial_str: str) -> str:
     # Mantém o mesmo número de dígitos (zero-padding)
     return f"{prefix}{str(next_number).zfill(len(number_part))}"
 
-# Checa se o conversor de HEIC está disponível
-try:
-    import pillow_heif
-    HEIC_SUPPORT = True
-except ImportError:
-    HEIC_SUPPORT = False
+@st.cache_resource
+def register_heic_support() -> bool:
+    """Checa se o conversor de HEIC está disponível e registra o decodificador no Pillow uma vez por processo."""
+    # O Streamlit reexecuta o script a cada interação: o cache evita repetir o registro em cada rerun
+    try:
+        import pillow_heif
+        pillow_heif.register_heif_opener()
+        return True
+    except ImportError:
+        return False
+
+HEIC_SUPPORT = register_heic_support()
 
 # =====================================
 # Estado da Sessão
@@ -241,6 +402,14 @@ if "camera_photos" not in st.session_state: st.session_state.camera_photos = []
 if "serial" not in st.session_state: st.session_state.serial = ""
 if "auto_increment_serial" not in st.session_state: st.session_state.auto_increment_serial = False
 if "last_used_zip_name" not in st.session_state: st.session_state.last_used_zip_name = ""
+if "default_zip_name" not in st.session_state: st.session_state.default_zip_name = time.strftime("fotos_%Y%m%d_%H%M.zip")
+if "camera_digests" not in st.session_state: st.session_state.camera_digests = set()
+if "file_digests" not in st.session_state: st.session_state.file_digests = {}
+if "caption_serial" not in st.session_state: st.session_state.caption_serial = None
+
+def clear_camera_photos() -> None:
+    # Callback do botão: roda antes do rerun disparado pelo clique, dispensando um st.rerun() extra
+    st.session_state.camera_photos.clear()
 
 # =====================================
 # Interface do Usuário (UI)
@@ -258,24 +427,42 @@ with tabs[0]:
     )
     
     photo = st.camera_input("Tire uma foto com a câmera")
+    # O camera_input devolve a mesma captura a cada rerun: só entra na fila uma vez.
+    # Os hashes não são apagados ao limpar a fila, para a última captura não voltar sozinha.
     if photo:
-        st.session_state.camera_photos.append(photo)
-
-    # Combina as duas fontes de arquivos
-    todos_os_arquivos = (files or []) + st.session_state.camera_photos
+        digest = file_digest(photo)
+        if digest not in st.session_state.camera_digests:
+            st.session_state.camera_digests.add(digest)
+            st.session_state.camera_photos.append(camera_photo_as_jpeg(photo))
+
+    # Combina as duas fontes de arquivos, ignorando conteúdo repetido
+    todos_os_arquivos = []
+    vistos: Set[bytes] = set()
+    for f in (files or []) + st.session_state.camera_photos:
+        # Hash memorizado por file_id; capturas já convertidas para JPEG (BytesIO) não têm file_id
+        file_id = getattr(f, "file_id", None)
+        if file_id is None:
+            digest = file_digest(f)
+        else:
+            if file_id not in st.session_state.file_digests:
+                st.session_state.file_digests[file_id] = file_digest(f)
+            digest = st.session_state.file_digests[file_id]
+        if digest not in vistos:
+            vistos.add(digest)
+            todos_os_arquivos.append(f)
+    duplicados = len(files or []) + len(st.session_state.camera_photos) - len(todos_os_arquivos)
     
     if todos_os_arquivos:
-        total_size = sum(f.getbuffer().nbytes for f in todos_os_arquivos)
+        total_size = sum(file_size(f) for f in todos_os_arquivos)
         st.info(f"**{len(todos_os_arquivos)}** arquivo(s) na fila. Tamanho total: **{sizeof_fmt(total_size)}**")
+    if duplicados:
+        st.caption(f"{duplicados} arquivo(s) repetido(s) ignorado(s).")
     
     if st.session_state.camera_photos:
-        if st.button("Limpar fotos da câmera"):
-            st.session_state.camera_photos.clear()
-            st.rerun()
+        st.button("Limpar fotos da câmera", on_click=clear_camera_photos)
 
 with tabs[1]:
     st.subheader("2. Defina as opções do envio")
-    default_zip_name = f"fotos_{datetime.now():%Y%m%d_%H%M}.zip"
     
     st.session_state.serial = st.text_input(
         "Número de Série (NS)", 
@@ -284,14 +471,16 @@ with tabs[1]:
     )
     
     base_zip_name = st.text_input("Nome base do arquivo ZIP", 
-        value=st.session_state.get("last_used_zip_name") or default_zip_name
+        value=st.session_state.last_used_zip_name or st.session_state.default_zip_name
     )
     st.session_state.last_used_zip_name = base_zip_name
         
-    caption = st.text_area(
-        "Legenda para a mensagem no Telegram", 
-        value=f"Fotos do NS {st.session_state.serial}.\nEnviado em {datetime.now():%d/%m/%Y %H:%M}."
-    )
+    # A legenda padrão só muda quando o NS muda: com um value que variasse entre reruns,
+    # o Streamlit recriaria o widget e apagaria o texto digitado. O horário entra no envio.
+    if st.session_state.caption_serial != st.session_state.serial:
+        st.session_state.caption = f"Fotos do NS {st.session_state.serial}."
+        st.session_state.caption_serial = st.session_state.serial
+    caption = st.text_area("Legenda para a mensagem no Telegram", key="caption")
     
     st.markdown("---")
     col1, col2 = st.columns(2)
@@ -312,7 +501,11 @@ with tabs[1]:
         if not HEIC_SUPPORT:
             st.caption("Instale `pillow-heif` para habilitar.")
             
-    compress_level = st.slider("Nível de compressão", 0, 9, 9, help="0 = sem compressão, 9 = máxima compressão.")
+    compress_level = st.slider(
+        "Nível de compressão do manifesto", 0, 9, 1,
+        help="As fotos (JPG, PNG, WEBP, HEIC) já são comprimidas e entram no ZIP sem recompressão. "
+             "Este nível vale apenas para o MANIFESTO.txt (0 = sem compressão, 9 = máxima)."
+    )
     st.caption(f"Exemplo de nome final: **{apply_serial_to_zipname(base_zip_name, st.session_state.serial)}**")
     
 with tabs[2]:
@@ -322,6 +515,9 @@ with tabs[2]:
     2.  **Opções**: Defina o Número de Série (NS), o nome do arquivo ZIP e a legenda da mensagem.
     3.  **Processar e Enviar**: Clique no botão principal abaixo para compactar tudo e enviar para o Telegram.
 
+    As fotos são guardadas no ZIP sem recompressão (elas já são comprimidas), o que torna a geração do arquivo bem mais rápida.
+    Se preferir receber as fotos soltas no chat, use **Enviar como álbum (sem ZIP)**: elas vão como documentos, em álbuns de até 10.
+
     **Configuração (`.streamlit/secrets.toml`):**
     ```toml
     [telegram]
@@ -336,54 +532,126 @@ with tabs[2]:
 st.markdown("---")
 st.subheader("3. Processe e envie")
 
-if st.button("Compactar e Enviar para o Telegram", type="primary", use_container_width=True, disabled=not todos_os_arquivos or not CREDENCIAIS_OK):
+col_zip, col_album = st.columns([3, 1])
+with col_zip:
+    enviar_zip = st.button("Compactar e Enviar para o Telegram", type="primary", use_container_width=True, disabled=not todos_os_arquivos or not CREDENCIAIS_OK)
+with col_album:
+    enviar_album = st.button("Enviar como álbum (sem ZIP)", use_container_width=True, disabled=not todos_os_arquivos or not CREDENCIAIS_OK,
+                             help="Envia as fotos soltas, em álbuns de até 10, sem gerar o ZIP.")
+
+if enviar_zip or enviar_album:
     
     # Validações iniciais
     if not st.session_state.serial:
         st.error("O campo 'Número de Série (NS)' é obrigatório.", icon="🚨")
         st.stop()
 
-    # Define os lotes de arquivos
-    if auto_split:
-        batches = chunk_files_by_size(todos_os_arquivos)
+    # Pré-checagem pelos tamanhos dos uploads: as fotos entram no ZIP sem compressão,
+    # então o que já passa do limite aqui seria recusado só depois de todo o trabalho
+    grandes = [getattr(f, "name", "foto") for f in todos_os_arquivos if file_size(f) > TELEGRAM_MAX_BYTES]
+    if grandes:
+        st.error(f"Arquivo(s) acima de 50 MB, o limite do Telegram: {', '.join(grandes)}", icon="🚨")
+        st.stop()
+    if enviar_zip and not auto_split and sum(file_size(f) for f in todos_os_arquivos) > TELEGRAM_MAX_BYTES:
+        st.error("As fotos somam mais de 50 MB. Ative 'Dividir ZIP > 50 MB' nas opções.", icon="🚨")
+        st.stop()
+
+    serial = st.session_state.serial
+    enviado_em = f"Enviado em {time.strftime('%d/%m/%Y %H:%M')}."
+    caption = f"{caption}\n{enviado_em}" if caption else enviado_em
+
+    if enviar_album:
+        # Álbum: as fotos vão soltas, cada uma como documento (sem recompressão do Telegram),
+        # em grupos de até 10 via sendMediaGroup; nenhum ZIP é montado
+        photos = [
+            (name, io.BytesIO(data) if data is not None else f)
+            for f, (name, data) in zip(todos_os_arquivos, prepare_photos(todos_os_arquivos, serial, convert_heic))
+        ]
+        # O limite de 50 MB vale por requisição, então os grupos respeitam o tamanho e a contagem
+        grupos = [
+            lote[j:j + 10]
+            for lote in chunk_files_by_size(photos, size_of=lambda photo: file_size(photo[1]))
+            for j in range(0, len(lote), 10)
+        ]
+
+        total_batches = len(grupos)
+        success_count = 0
+
+        with st.status(f"Enviando {len(photos)} foto(s) como álbum...", expanded=True) as status:
+            barra = st.progress(0.0)
+            for i, grupo in enumerate(grupos, start=1):
+                is_multipart = total_batches > 1
+                status.update(label=f"Enviando álbum {i} de {total_batches}...")
+                try:
+                    final_caption = f"Parte {i}\n\n{caption}" if is_multipart else caption
+                    send_album_to_telegram(grupo, BOT_TOKEN, CHAT_ID, final_caption)
+                    st.success(f"Álbum {i} enviado com sucesso ({len(grupo)} foto(s))!", icon="🎉")
+                    success_count += 1
+                    barra.progress(i / total_batches)
+                except Exception as e:
+                    st.error(f"Falha ao enviar o álbum {i}: {e}", icon="🔥")
+                    status.update(label=f"Falha no álbum {i} de {total_batches}", state="error")
+                    break
+            else:
+                status.update(label=f"{total_batches} álbum(ns) enviado(s)", state="complete", expanded=False)
+
     else:
-        batches = [todos_os_arquivos]
-    
-    total_batches = len(batches)
-    success_count = 0
+        # Define os lotes de arquivos
+        if auto_split:
+            batches = chunk_files_by_size(todos_os_arquivos)
+        else:
+            batches = [todos_os_arquivos]
     
-    with st.spinner(f"Processando {len(todos_os_arquivos)} arquivo(s)..."):
-        for i, batch_files in enumerate(batches, start=1):
-            is_multipart = total_batches > 1
-            part_num = i if is_multipart else None
+        total_batches = len(batches)
+        success_count = 0
+
+        def gerar_zip(i: int) -> Tuple[str, io.BytesIO]:
+            # 1. Gerar nome do ZIP e 2. criar o ZIP em memória
+            part_num = i if total_batches > 1 else None
+            zip_name = apply_serial_to_zipname(base_zip_name, serial, part=part_num)
+            zip_stream = make_zip_in_memory(
+                file_objs=batches[i - 1],
+                filename=zip_name,
+                serial=serial,
+                convert_heic=convert_heic,
+                compresslevel=compress_level
+            )
+            return zip_name, zip_stream
+
+        # O ZIP do próximo lote é gerado em segundo plano enquanto o atual é enviado.
+        # Os envios continuam em sequência para manter a ordem das partes no chat.
+        # O st.status mostra o andamento sem empilhar um aviso por lote na página.
+        with st.status(f"Processando {len(todos_os_arquivos)} arquivo(s)...", expanded=True) as status, \
+                ThreadPoolExecutor(max_workers=1) as pool:
+            barra = st.progress(0.0)
+            proximo_zip = pool.submit(gerar_zip, 1)
+            for i in range(1, total_batches + 1):
+                is_multipart = total_batches > 1
+                part_num = i if is_multipart else None
             
-            progress_text = f"Processando lote {i} de {total_batches}..."
-            st.info(progress_text)
+                status.update(label=f"Processando lote {i} de {total_batches}...")
             
-            try:
-                # 1. Gerar nome do ZIP
-                zip_name = apply_serial_to_zipname(base_zip_name, st.session_state.serial, part=part_num)
-                
-                # 2. Criar o ZIP em memória
-                zip_bytes = make_zip_in_memory(
-                    file_objs=batch_files,
-                    filename=zip_name,
-                    serial=st.session_state.serial,
-                    convert_heic=convert_heic,
-                    compresslevel=compress_level
-                )
+                try:
+                    zip_name, zip_stream = proximo_zip.result()
+                    if i < total_batches:
+                        proximo_zip = pool.submit(gerar_zip, i + 1)
                 
-                # 3. Enviar para o Telegram
-                final_caption = f"Parte {part_num}\n\n{caption}" if is_multipart else caption
-                send_zip_to_telegram(zip_bytes, zip_name, BOT_TOKEN, CHAT_ID, final_caption)
+                    # 3. Enviar para o Telegram
+                    final_caption = f"Parte {part_num}\n\n{caption}" if is_multipart else caption
+                    send_zip_to_telegram(zip_stream, zip_name, BOT_TOKEN, CHAT_ID, final_caption)
                 
-                st.success(f"Lote {i} enviado com sucesso como '{zip_name}'!", icon="🎉")
-                success_count += 1
-
-            except Exception as e:
-                st.error(f"Falha ao enviar o lote {i}: {e}", icon="🔥")
-                # Interrompe o processo se um lote falhar
-                break
+                    st.success(f"Lote {i} enviado com sucesso como '{zip_name}'!", icon="🎉")
+                    success_count += 1
+                    barra.progress(i / total_batches)
+
+                except Exception as e:
+                    st.error(f"Falha ao enviar o lote {i}: {e}", icon="🔥")
+                    # Interrompe o processo se um lote falhar
+                    proximo_zip.cancel()
+                    status.update(label=f"Falha no lote {i} de {total_batches}", state="error")
+                    break
+            else:
+                status.update(label=f"{total_batches} lote(s) enviado(s)", state="complete", expanded=False)
 
     # Lógica pós-envio
     if success_count == total_batches: